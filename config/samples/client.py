@@ -13,12 +13,30 @@ Usage:
     kubectl port-forward svc/add-sub-server-svc -n kalypso-system 8000:8000 8001:8001
 
     # Then run this script
-    python client.py --protocol http --host localhost --port 8000
     python client.py --protocol grpc --host localhost --port 8001
+    python client.py --protocol http --host localhost --port 8000
+
+    # Keep several requests in flight so the server's dynamic batcher can merge them
+    python client.py --protocol grpc --concurrency 16
+
+    # Drive sustained load: 16 requests in flight until 16 x 1000 have completed
+    python client.py --protocol grpc --concurrency 16 --iterations 1000 --pool-size 4
+
+    # When running on the same host as the server (e.g. inside the Triton pod),
+    # pass inputs through system shared memory instead of the request payload
+    python client.py --protocol grpc --shared-memory system
+
+    # Query the half-precision variant of the model
+    python client.py --model add_sub_fp16 --dtype FP16
 """
 
 import argparse
 import sys
+import time
+from collections import deque
+from concurrent.futures import Future
+from functools import partial
+from itertools import cycle
 import numpy as np
 
 # HTTP client
@@ -35,14 +53,45 @@ try:
 except ImportError:
     GRPC_AVAILABLE = False
 
-
-def create_http_client(host: str, port: int):
+# System shared memory utilities
+try:
+    import tritonclient.utils.shared_memory as shm
+    SHM_AVAILABLE = True
+except ImportError:
+    SHM_AVAILABLE = False
+
+# Supported tensor datatypes and their numpy equivalents
+DTYPES = {
+    "FP32": np.float32,
+    "FP16": np.float16,
+}
+
+# Channel options for every gRPC client: keep HTTP/2 connections alive,
+# give each client its own subchannel so a pool really opens separate
+# connections, and keep tritonclient's default unlimited message sizes
+# (setting channel_args replaces those defaults)
+GRPC_CHANNEL_ARGS = [
+    ("grpc.keepalive_time_ms", 20000),
+    ("grpc.keepalive_timeout_ms", 10000),
+    ("grpc.http2.max_pings_without_data", 0),
+    ("grpc.use_local_subchannel_pool", 1),
+    ("grpc.max_send_message_length", 2**31 - 1),
+    ("grpc.max_receive_message_length", 2**31 - 1),
+]
+
+# Both inputs live back to back in a single shared memory region
+SHM_REGION_NAME = "add_sub_inputs"
+SHM_REGION_KEY = "/add_sub_inputs"
+
+
+def create_http_client(host: str, port: int, concurrency: int = 1):
     """Create HTTP Triton client."""
     if not HTTP_AVAILABLE:
         raise RuntimeError("tritonclient[http] is not installed. Run: pip install tritonclient[http]")
     
     url = f"{host}:{port}"
-    client = httpclient.InferenceServerClient(url=url)
+    # One connection per in-flight request so async_infer calls run concurrently
+    client = httpclient.InferenceServerClient(url=url, concurrency=concurrency)
     return client
 
 
@@ -52,60 +101,129 @@ def create_grpc_client(host: str, port: int):
         raise RuntimeError("tritonclient[grpc] is not installed. Run: pip install tritonclient[grpc]")
     
     url = f"{host}:{port}"
-    client = grpcclient.InferenceServerClient(url=url)
+    client = grpcclient.InferenceServerClient(url=url, channel_args=GRPC_CHANNEL_ARGS)
     return client
 
 
-def infer_http(client, model_name: str, input0: np.ndarray, input1: np.ndarray):
-    """Perform inference using HTTP protocol."""
-    # Create input tensors
-    inputs = [
-        httpclient.InferInput("INPUT0", input0.shape, "FP32"),
-        httpclient.InferInput("INPUT1", input1.shape, "FP32"),
-    ]
-    inputs[0].set_data_from_numpy(input0)
-    inputs[1].set_data_from_numpy(input1)
+def create_grpc_client_pool(host: str, port: int, pool_size: int):
+    """Create gRPC Triton clients that each own a separate channel."""
+    return [create_grpc_client(host, port) for _ in range(pool_size)]
 
-    # Define output tensors
-    outputs = [
-        httpclient.InferRequestedOutput("OUTPUT0"),
-        httpclient.InferRequestedOutput("OUTPUT1"),
-    ]
 
-    # Perform inference
-    result = client.infer(model_name=model_name, inputs=inputs, outputs=outputs)
+def create_input_shared_memory(client, input0: np.ndarray, input1: np.ndarray):
+    """Copy both inputs into a system shared memory region and register it with the server."""
+    if not SHM_AVAILABLE:
+        raise RuntimeError("tritonclient shared memory utilities are not available. Run: pip install tritonclient[all]")
 
-    # Get output tensors
-    output0 = result.as_numpy("OUTPUT0")
-    output1 = result.as_numpy("OUTPUT1")
+    byte_size = input0.nbytes + input1.nbytes
 
-    return output0, output1
+    # Drop a registration left behind by an earlier run
+    client.unregister_system_shared_memory(SHM_REGION_NAME)
 
+    handle = shm.create_shared_memory_region(SHM_REGION_NAME, SHM_REGION_KEY, byte_size)
+    shm.set_shared_memory_region(handle, [input0, input1])
+    client.register_system_shared_memory(SHM_REGION_NAME, SHM_REGION_KEY, byte_size)
+    return handle
 
-def infer_grpc(client, model_name: str, input0: np.ndarray, input1: np.ndarray):
-    """Perform inference using gRPC protocol."""
-    # Create input tensors
-    inputs = [
-        grpcclient.InferInput("INPUT0", input0.shape, "FP32"),
-        grpcclient.InferInput("INPUT1", input1.shape, "FP32"),
-    ]
-    inputs[0].set_data_from_numpy(input0)
-    inputs[1].set_data_from_numpy(input1)
 
-    # Define output tensors
-    outputs = [
-        grpcclient.InferRequestedOutput("OUTPUT0"),
-        grpcclient.InferRequestedOutput("OUTPUT1"),
-    ]
+def destroy_input_shared_memory(client, handle):
+    """Unregister and release the input shared memory region."""
+    client.unregister_system_shared_memory(SHM_REGION_NAME)
+    shm.destroy_shared_memory_region(handle)
 
-    # Perform inference
-    result = client.infer(model_name=model_name, inputs=inputs, outputs=outputs)
 
-    # Get output tensors
-    output0 = result.as_numpy("OUTPUT0")
-    output1 = result.as_numpy("OUTPUT1")
+def _complete_future(future: Future, result, error):
+    """gRPC async_infer callback that resolves the matching future."""
+    if error is not None:
+        future.set_exception(error)
+    else:
+        future.set_result(result)
 
-    return output0, output1
+
+class InferSession:
+    """Reusable inference request for one model, protocol, and input shape.
+
+    The InferInput and InferRequestedOutput objects are built once; each call
+    only swaps in the new input data, so repeated requests skip rebuilding and
+    re-validating the tensor descriptors. Requests are spread round-robin over
+    ``clients``.
+    """
+
+    def __init__(self, clients, protocol: str, model_name: str, shape,
+                 shared_memory: bool = False, datatype: str = "FP32"):
+        module = httpclient if protocol == "http" else grpcclient
+        self.clients = cycle(clients)
+        self.protocol = protocol
+        self.model_name = model_name
+        self.shared_memory = shared_memory
+
+        # Create input tensors
+        self.inputs = [
+            module.InferInput("INPUT0", list(shape), datatype),
+            module.InferInput("INPUT1", list(shape), datatype),
+        ]
+
+        # Define output tensors; over HTTP ask for raw bytes instead of JSON numbers
+        if protocol == "http":
+            self.outputs = [
+                httpclient.InferRequestedOutput("OUTPUT0", binary_data=True),
+                httpclient.InferRequestedOutput("OUTPUT1", binary_data=True),
+            ]
+        else:
+            self.outputs = [
+                grpcclient.InferRequestedOutput("OUTPUT0"),
+                grpcclient.InferRequestedOutput("OUTPUT1"),
+            ]
+
+        if shared_memory:
+            # Inputs are read from the region set up by create_input_shared_memory
+            byte_size = int(np.prod(shape)) * np.dtype(DTYPES[datatype]).itemsize
+            self.inputs[0].set_shared_memory(SHM_REGION_NAME, byte_size)
+            self.inputs[1].set_shared_memory(SHM_REGION_NAME, byte_size, offset=byte_size)
+
+    def run(self, input0: np.ndarray, input1: np.ndarray, concurrency: int, total: int):
+        """Send ``total`` requests while keeping up to ``concurrency`` in flight.
+
+        A new request goes out as soon as the oldest one completes, so the server
+        sees a steady queue to batch from. Yields one (OUTPUT0, OUTPUT1) pair per
+        request in the order they were sent. With shared memory the inputs already
+        live in the registered region and the arguments are not sent.
+        """
+        if not self.shared_memory:
+            if self.protocol == "http":
+                # Send raw tensor bytes rather than JSON-encoded floats
+                self.inputs[0].set_data_from_numpy(input0, binary_data=True)
+                self.inputs[1].set_data_from_numpy(input1, binary_data=True)
+            else:
+                self.inputs[0].set_data_from_numpy(input0)
+                self.inputs[1].set_data_from_numpy(input1)
+
+        pending = deque()
+        for _ in range(total):
+            if len(pending) == concurrency:
+                yield self._get_outputs(pending.popleft()())
+            pending.append(self._submit())
+
+        while pending:
+            yield self._get_outputs(pending.popleft()())
+
+    def _submit(self):
+        """Send one request and return a callable that waits for its result."""
+        client = next(self.clients)
+        if self.protocol == "http":
+            request = client.async_infer(model_name=self.model_name, inputs=self.inputs,
+                                         outputs=self.outputs)
+            return request.get_result
+
+        future = Future()
+        client.async_infer(model_name=self.model_name, inputs=self.inputs,
+                           outputs=self.outputs, callback=partial(_complete_future, future))
+        return future.result
+
+    @staticmethod
+    def _get_outputs(result):
+        """Get output tensors."""
+        return result.as_numpy("OUTPUT0"), result.as_numpy("OUTPUT1")
 
 
 def check_server_health(client, protocol: str) -> bool:
@@ -158,9 +276,9 @@ def main():
     parser.add_argument(
         "--protocol",
         type=str,
-        default="http",
+        default="grpc",
         choices=["http", "grpc"],
-        help="Protocol to use for inference (default: http)"
+        help="Protocol to use for inference (default: grpc)"
     )
     parser.add_argument(
         "--host",
@@ -186,8 +304,43 @@ def main():
         default=1,
         help="Batch size for inference (default: 1)"
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Number of inference requests kept in flight at once (default: 1)"
+    )
+    parser.add_argument(
+        "--iterations",
+        type=int,
+        default=1,
+        help="Number of requests to send per in-flight slot (default: 1)"
+    )
+    parser.add_argument(
+        "--pool-size",
+        type=int,
+        default=1,
+        help="Number of gRPC channels requests are spread across (default: 1)"
+    )
+    parser.add_argument(
+        "--dtype",
+        type=str,
+        default="FP32",
+        choices=list(DTYPES),
+        help="Input datatype; use FP16 with the add_sub_fp16 model (default: FP32)"
+    )
+    parser.add_argument(
+        "--shared-memory",
+        type=str,
+        default="none",
+        choices=["none", "system"],
+        help="Pass inputs through system shared memory; requires running on the server's host (default: none)"
+    )
     args = parser.parse_args()
 
+    if args.concurrency < 1 or args.iterations < 1 or args.pool_size < 1:
+        parser.error("--concurrency, --iterations and --pool-size must be at least 1")
+
     # Set default port based on protocol
     if args.port is None:
         args.port = 8000 if args.protocol == "http" else 8001
@@ -199,14 +352,21 @@ def main():
     print(f"Server: {args.host}:{args.port}")
     print(f"Model: {args.model}")
     print(f"Batch Size: {args.batch_size}")
+    print(f"Datatype: {args.dtype}")
+    print(f"Concurrency: {args.concurrency}")
+    print(f"Iterations: {args.iterations}")
+    if args.protocol == "grpc":
+        print(f"Channel Pool Size: {args.pool_size}")
+    print(f"Shared Memory: {args.shared_memory}")
     print("=" * 60)
 
     # Create client
     try:
         if args.protocol == "http":
-            client = create_http_client(args.host, args.port)
+            clients = [create_http_client(args.host, args.port, args.concurrency)]
         else:
-            client = create_grpc_client(args.host, args.port)
+            clients = create_grpc_client_pool(args.host, args.port, args.pool_size)
+        client = clients[0]
     except Exception as e:
         print(f"Failed to create client: {e}")
         sys.exit(1)
@@ -229,22 +389,47 @@ def main():
 
     # Prepare input data
     print(f"\n[4] Preparing input data...")
-    # Create sample input: batch_size x 4 float32 arrays
-    input0 = np.array([[1.0, 2.0, 3.0, 4.0]] * args.batch_size, dtype=np.float32)
-    input1 = np.array([[4.0, 3.0, 2.0, 1.0]] * args.batch_size, dtype=np.float32)
+    # Create sample input: batch_size x 4 arrays of the requested datatype
+    # (broadcast the single row in C, then materialize one contiguous buffer)
+    shape = (args.batch_size, 4)
+    dtype = DTYPES[args.dtype]
+    input0 = np.ascontiguousarray(
+        np.broadcast_to(np.array([1.0, 2.0, 3.0, 4.0], dtype=dtype), shape))
+    input1 = np.ascontiguousarray(
+        np.broadcast_to(np.array([4.0, 3.0, 2.0, 1.0], dtype=dtype), shape))
     
     print(f"INPUT0 shape: {input0.shape}")
     print(f"INPUT0 data: {input0[0].tolist()}")
     print(f"INPUT1 shape: {input1.shape}")
     print(f"INPUT1 data: {input1[0].tolist()}")
 
+    use_shm = args.shared_memory == "system"
+    shm_handle = None
+    if use_shm:
+        try:
+            shm_handle = create_input_shared_memory(client, input0, input1)
+        except Exception as e:
+            print(f"Failed to set up shared memory: {e}")
+            sys.exit(1)
+        print(f"Inputs placed in shared memory region '{SHM_REGION_NAME}'")
+
     # Perform inference
     print(f"\n[5] Performing inference...")
     try:
-        if args.protocol == "http":
-            output0, output1 = infer_http(client, args.model, input0, input1)
-        else:
-            output0, output1 = infer_grpc(client, args.model, input0, input1)
+        session = InferSession(clients, args.protocol, args.model, input0.shape,
+                               use_shm, args.dtype)
+
+        # Verify results as they arrive
+        expected_add = input0 + input1
+        expected_sub = input0 - input1
+        total = args.concurrency * args.iterations
+        mismatches = 0
+
+        start = time.perf_counter()
+        for output0, output1 in session.run(input0, input1, args.concurrency, total):
+            if not (np.allclose(output0, expected_add) and np.allclose(output1, expected_sub)):
+                mismatches += 1
+        elapsed = time.perf_counter() - start
         
         print("\n" + "=" * 60)
         print("INFERENCE RESULTS")
@@ -254,22 +439,23 @@ def main():
         print("-" * 60)
         print(f"OUTPUT0 (INPUT0 + INPUT1): {output0[0].tolist()}")
         print(f"OUTPUT1 (INPUT0 - INPUT1): {output1[0].tolist()}")
+        print("-" * 60)
+        print(f"Requests: {total} in {elapsed:.3f}s ({total / elapsed:.1f} infer/sec)")
         print("=" * 60)
         
-        # Verify results
-        expected_add = input0[0] + input1[0]
-        expected_sub = input0[0] - input1[0]
-        
-        if np.allclose(output0[0], expected_add) and np.allclose(output1[0], expected_sub):
-            print("\n✅ Inference successful! Results are correct.")
+        if mismatches == 0:
+            print(f"\n✅ Inference successful! All {total} results are correct.")
         else:
-            print("\n⚠️  Inference completed but results don't match expected values.")
-            print(f"Expected OUTPUT0: {expected_add.tolist()}")
-            print(f"Expected OUTPUT1: {expected_sub.tolist()}")
+            print(f"\n⚠️  Inference completed but {mismatches} of {total} results don't match expected values.")
+            print(f"Expected OUTPUT0: {expected_add[0].tolist()}")
+            print(f"Expected OUTPUT1: {expected_sub[0].tolist()}")
             
     except Exception as e:
         print(f"\n❌ Inference failed: {e}")
         sys.exit(1)
+    finally:
+        if shm_handle is not None:
+            destroy_input_shared_memory(client, shm_handle)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+ONNX Export Script for the add_sub_onnx Sample Model
+
+This script builds the same Add/Sub model as models/add_sub as a two-node
+ONNX graph, so it can be served by Triton's ONNX Runtime backend without
+going through the Python backend on every request.
+
+Prerequisites:
+    pip install onnx
+
+The generated models/add_sub_onnx/1/model.onnx is checked in so the sample
+model repository loads as-is; rerun this script only after changing the graph.
+
+Usage:
+    # Writes models/add_sub_onnx/1/model.onnx next to this script
+    python export_add_sub_onnx.py
+
+    # Then upload the model repository as usual and query it with
+    python client.py --model add_sub_onnx
+"""
+
+import argparse
+import os
+import sys
+
+try:
+    import onnx
+    from onnx import TensorProto, helper
+    ONNX_AVAILABLE = True
+except ImportError:
+    ONNX_AVAILABLE = False
+
+
+def build_model():
+    """Build the ONNX graph: OUTPUT0 = INPUT0 + INPUT1, OUTPUT1 = INPUT0 - INPUT1."""
+    # Leading dimension is the batch dimension Triton adds for max_batch_size > 0
+    shape = ["batch", 4]
+    inputs = [
+        helper.make_tensor_value_info("INPUT0", TensorProto.FLOAT, shape),
+        helper.make_tensor_value_info("INPUT1", TensorProto.FLOAT, shape),
+    ]
+    outputs = [
+        helper.make_tensor_value_info("OUTPUT0", TensorProto.FLOAT, shape),
+        helper.make_tensor_value_info("OUTPUT1", TensorProto.FLOAT, shape),
+    ]
+    nodes = [
+        helper.make_node("Add", ["INPUT0", "INPUT1"], ["OUTPUT0"]),
+        helper.make_node("Sub", ["INPUT0", "INPUT1"], ["OUTPUT1"]),
+    ]
+
+    graph = helper.make_graph(nodes, "add_sub", inputs, outputs)
+    # Pin the IR version: newer onnx releases default to an IR version that the
+    # ONNX Runtime shipped with tritonserver 24.12 (IR <= 10) refuses to load
+    model = helper.make_model(graph, opset_imports=[helper.make_opsetid("", 13)],
+                              ir_version=8)
+    onnx.checker.check_model(model)
+    return model
+
+
+def main():
+    default_output = os.path.join(
+        os.path.dirname(os.path.abspath(__file__)),
+        "models", "add_sub_onnx", "1", "model.onnx")
+
+    parser = argparse.ArgumentParser(description="Export the add_sub sample model to ONNX")
+    parser.add_argument(
+        "--output",
+        type=str,
+        default=default_output,
+        help="Path of the exported model (default: models/add_sub_onnx/1/model.onnx)"
+    )
+    args = parser.parse_args()
+
+    if not ONNX_AVAILABLE:
+        print("onnx is not installed. Run: pip install onnx")
+        sys.exit(1)
+
+    os.makedirs(os.path.dirname(args.output), exist_ok=True)
+    onnx.save(build_model(), args.output)
+    print(f"Exported add_sub ONNX model to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
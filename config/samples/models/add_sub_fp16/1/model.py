@@ -0,0 +1,222 @@
+import contextlib
+import json
+import numpy as np
+import triton_python_backend_utils as pb_utils
+
+# CuPy is optional; it is only used by GPU instances (KIND_GPU)
+try:
+    import cupy as cp
+    CUPY_AVAILABLE = True
+except ImportError:
+    CUPY_AVAILABLE = False
+
+
+class TritonPythonModel:
+    """Simple Add/Sub model for KalypsoServing demo.
+    
+    This model takes two input tensors (INPUT0, INPUT1) and produces:
+    - OUTPUT0: INPUT0 + INPUT1 (element-wise addition)
+    - OUTPUT1: INPUT0 - INPUT1 (element-wise subtraction)
+    """
+
+    def initialize(self, args):
+        """Initialize the model.
+        
+        Args:
+            args: Dictionary containing model configuration
+        """
+        self.model_config = json.loads(args['model_config'])
+        
+        # Get input and output configuration
+        input0_config = pb_utils.get_input_config_by_name(
+            self.model_config, "INPUT0")
+        input1_config = pb_utils.get_input_config_by_name(
+            self.model_config, "INPUT1")
+        output0_config = pb_utils.get_output_config_by_name(
+            self.model_config, "OUTPUT0")
+        output1_config = pb_utils.get_output_config_by_name(
+            self.model_config, "OUTPUT1")
+
+        # Convert Triton types to numpy types
+        self.input_dtype = np.result_type(
+            pb_utils.triton_string_to_numpy(input0_config['data_type']),
+            pb_utils.triton_string_to_numpy(input1_config['data_type']))
+        self.output0_dtype = pb_utils.triton_string_to_numpy(
+            output0_config['data_type'])
+        self.output1_dtype = pb_utils.triton_string_to_numpy(
+            output1_config['data_type'])
+
+        # Tensor names used on every execute() call
+        self._in0, self._in1 = "INPUT0", "INPUT1"
+        self._out0, self._out1 = "OUTPUT0", "OUTPUT1"
+
+        # Results are written straight into output-typed buffers, so check
+        # once here that the ufuncs can store into them without an astype()
+        for name, dtype in (("OUTPUT0", self.output0_dtype),
+                            ("OUTPUT1", self.output1_dtype)):
+            if not np.can_cast(self.input_dtype, dtype,
+                               casting='same_kind'):
+                raise pb_utils.TritonModelException(
+                    f"{name} type {np.dtype(dtype).name} cannot hold "
+                    f"{self.input_dtype.name} results")
+
+        # The CuPy kernel is generic over FP16 and FP32 as long as all I/O
+        # types match
+        io_dtypes = {np.dtype(dtype) for dtype in
+                     (self.input_dtype, self.output0_dtype,
+                      self.output1_dtype)}
+        gpu_dtype_ok = (len(io_dtypes) == 1 and io_dtypes <=
+                        {np.dtype(np.float16), np.dtype(np.float32)})
+
+        # GPU instances run add/sub as a single CuPy kernel on their device
+        self.use_cupy = (CUPY_AVAILABLE and gpu_dtype_ok
+                         and args['model_instance_kind'] == "GPU")
+
+        if self.use_cupy:
+            self._device = cp.cuda.Device(
+                int(args['model_instance_device_id']))
+            self._add_sub_gpu = cp.ElementwiseKernel(
+                'T a, T b', 'T s, T d', 's = a + b; d = a - b', 'add_sub')
+        else:
+            self._device = contextlib.nullcontext()
+
+            # CPU results go into per-instance scratch buffers sized for a
+            # full batch, so execute() never allocates or page-faults them.
+            # CuPy's memory pool already recycles device allocations.
+            # Dims are int64 in the config and so arrive as JSON strings.
+            dims = [int(dim) for dim in output0_config['dims']]
+            max_batch_size = max(self.model_config.get('max_batch_size', 0), 1)
+            if all(dim > 0 for dim in dims):
+                self._allocate_scratch(max_batch_size * int(np.prod(dims)))
+            else:
+                self._allocate_scratch(0)
+
+        self._warmup(input0_config)
+
+    def execute(self, requests):
+        """Process inference requests.
+        
+        Args:
+            requests: List of pb_utils.InferenceRequest
+            
+        Returns:
+            List of pb_utils.InferenceResponse
+        """
+        # Bind the per-request helpers locally for the loops below
+        get_input = pb_utils.get_input_tensor_by_name
+        from_dlpack = pb_utils.Tensor.from_dlpack
+        InferenceResponse = pb_utils.InferenceResponse
+        in0, in1 = self._in0, self._in1
+        out0, out1 = self._out0, self._out1
+
+        xp = cp if self.use_cupy else np
+
+        with self._device:
+            input0_list = []
+            input1_list = []
+
+            for request in requests:
+                # Get input tensors
+                input0 = get_input(request, in0)
+                input1 = get_input(request, in1)
+
+                # Wrap as numpy (or CuPy) arrays
+                input0_list.append(self._to_array(input0))
+                input1_list.append(self._to_array(input1))
+
+            # Chain all requests along the batch dimension so the add and
+            # subtract run once per execute() call instead of once per
+            # request. A lone request is used as-is to skip the copy.
+            if len(input0_list) == 1:
+                input0_data = input0_list[0]
+                input1_data = input1_list[0]
+            else:
+                input0_data = xp.concatenate(input0_list)
+                input1_data = xp.concatenate(input1_list)
+
+            add_result, sub_result = self._fused_add_sub(input0_data,
+                                                         input1_data)
+
+            # Split the batched results back into per-request views
+            split_points = np.cumsum(
+                [input0_batch.shape[0] for input0_batch in input0_list])[:-1]
+            split_points = split_points.tolist()
+            responses = []
+
+            for add_batch, sub_batch in zip(xp.split(add_result, split_points),
+                                            xp.split(sub_result, split_points)):
+                # Create output tensors that wrap the result buffers as-is
+                output0_tensor = from_dlpack(out0, add_batch)
+                output1_tensor = from_dlpack(out1, sub_batch)
+
+                # Create inference response
+                inference_response = InferenceResponse(
+                    output_tensors=[output0_tensor, output1_tensor])
+                responses.append(inference_response)
+
+        return responses
+
+    def _to_array(self, tensor):
+        """Wrap an input tensor's buffer as a numpy or CuPy array via DLPack."""
+        if not self.use_cupy:
+            return np.from_dlpack(tensor)
+        # GPU instances still receive host inputs unless the model sets
+        # FORCE_CPU_ONLY_INPUT_TENSORS to "no"
+        if tensor.is_cpu():
+            return cp.asarray(np.from_dlpack(tensor))
+        return cp.from_dlpack(tensor)
+
+    def _fused_add_sub(self, input0_data, input1_data):
+        """Return (input0 + input1, input0 - input1) in the output dtypes.
+
+        Both results are written straight into pre-allocated buffers. They
+        are C-contiguous and already in the configured output dtypes, so
+        pb_utils.Tensor.from_dlpack can wrap them without a conversion pass.
+        """
+        if self.use_cupy:
+            add_result = cp.empty(input0_data.shape, dtype=self.output0_dtype)
+            sub_result = cp.empty(input0_data.shape, dtype=self.output1_dtype)
+            self._add_sub_gpu(input0_data, input1_data, add_result, sub_result)
+            # Outputs are exported through DLPack, so finish the kernel first
+            cp.cuda.get_current_stream().synchronize()
+            return add_result, sub_result
+
+        # Reuse the scratch buffers; the responses that wrap them are sent
+        # before Triton calls execute() on this instance again
+        size = input0_data.size
+        if size > self._add_buf.size:
+            self._allocate_scratch(size)
+        add_result = self._add_buf[:size].reshape(input0_data.shape)
+        sub_result = self._sub_buf[:size].reshape(input0_data.shape)
+        np.add(input0_data, input1_data, out=add_result,
+               casting='same_kind')
+        np.subtract(input0_data, input1_data, out=sub_result,
+                    casting='same_kind')
+        return add_result, sub_result
+
+    def _warmup(self, input_config):
+        """Run the execute() math and output path once on dummy data.
+
+        This compiles the CuPy kernel, primes NumPy's ufunc dispatch and
+        resolves the DLPack tensor binding before the first real request.
+        """
+        # Variable-size dims (-1) are warmed up with a size of 1
+        dims = [max(int(dim), 1) for dim in input_config['dims']]
+        xp = cp if self.use_cupy else np
+        with self._device:
+            dummy = xp.ones([1] + dims, dtype=self.input_dtype)
+            add_result, sub_result = self._fused_add_sub(dummy, dummy)
+            pb_utils.Tensor.from_dlpack(self._out0, add_result)
+            pb_utils.Tensor.from_dlpack(self._out1, sub_result)
+
+    def _allocate_scratch(self, size):
+        """(Re)allocate the CPU output buffers and touch every page once."""
+        self._add_buf = np.empty(size, dtype=self.output0_dtype)
+        self._sub_buf = np.empty(size, dtype=self.output1_dtype)
+        self._add_buf.fill(0)
+        self._sub_buf.fill(0)
+
+    def finalize(self):
+        """Clean up resources."""
+        pass
+